@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 import asyncio
 import os
-import json
-import requests
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+import aiohttp
+import ijson
+import orjson
+from asyncio_throttle import Throttler
 from typing import Optional
 from mcp.server.models import InitializationOptions
 import mcp.types as types
@@ -12,24 +17,244 @@ import mcp.server.stdio
 # Jira Configuration
 JIRA_URL = os.getenv("JIRA_URL", "")
 JIRA_PAT = os.getenv("JIRA_PAT", "")
+JIRA_MAX_WORKERS = max(1, int(os.getenv("JIRA_MAX_WORKERS", "8")))
+MAX_BULK_ISSUES = 50
+JIRA_RPS = max(1, int(os.getenv("JIRA_RPS", "10")))
+JIRA_MAX_RETRIES = max(0, int(os.getenv("JIRA_MAX_RETRIES", "3")))
+JIRA_PRETTY = os.getenv("JIRA_PRETTY") == "1"
+
+# Longest wait before retrying a 429, whatever Retry-After asks for
+MAX_RETRY_DELAY = 30.0
+
+# Tool output is compact JSON unless pretty-printing is enabled for humans
+_JSON_OPTION = orjson.OPT_INDENT_2 if JIRA_PRETTY else 0
+
+# Maximum bytes of a non-JSON error body kept as error detail, and of a JSON error body parsed
+ERROR_DETAIL_LIMIT = 512
+ERROR_JSON_LIMIT = 64 * 1024
+
+# Connection pool: keep-alive connections are reused across tool calls
+POOL_MAX_CONNECTIONS = 20
+POOL_KEEPALIVE_TIMEOUT = 60
+
+# Headers for authentication with PAT
+_HEADERS = {
+    "Authorization": f"Bearer {JIRA_PAT}",
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+}
+
+# Fields requested by the search tools
+_SEARCH_FIELDS = "summary,status,assignee,issuetype,priority,created,updated"
+_MY_FIELDS = "summary,status,issuetype,priority,updated"
+
+def escape_jql(value) -> str:
+    """Escape a value for use inside a quoted JQL string"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+# JQL predicate builder for each search_issues argument, applied to the raw value
+_JQL_PREDICATES = (
+    ("project", lambda v: f'project = "{escape_jql(v)}"'),
+    ("status", lambda v: f'status = "{escape_jql(v)}"'),
+    ("assignee", lambda v: "assignee = currentUser()" if str(v).lower() == "currentuser()"
+        else f'assignee = "{escape_jql(v)}"'),
+    ("issue_type", lambda v: f'issuetype = "{escape_jql(v)}"'),
+    ("priority", lambda v: f'priority = "{escape_jql(v)}"'),
+    ("fix_version", lambda v: f'fixVersion = "{escape_jql(v)}"'),
+    ("text", lambda v: '(summary ~ "{0}" OR description ~ "{0}")'.format(escape_jql(v))),
+)
 
 # Server creation
 server = Server("jira-mcp")
 
-def get_headers():
-    """Get headers for authentication with PAT"""
-    return {
-        "Authorization": f"Bearer {JIRA_PAT}",
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
+# Response cache: key -> (expires_at, data). TTLs in seconds by endpoint prefix
+CACHE_TTLS = (("issue/", 60.0), ("search", 10.0))
+CACHE_MAX_ENTRIES = 512
+_cache: dict = {}
 
-def make_jira_request(endpoint: str, params: Optional[dict] = None):
-    """Make a GET request to Jira API"""
+# Fetches in progress, shared by concurrent callers asking for the same key
+_inflight: dict[tuple, asyncio.Future] = {}
+
+# Client-side rate limit for all outbound Jira requests
+_throttler = Throttler(rate_limit=JIRA_RPS, period=1)
+
+# Shared HTTP session, opened in main() for the lifetime of the server
+_session: Optional[aiohttp.ClientSession] = None
+
+class JiraHTTPError(Exception):
+    """Error response returned by the Jira API"""
+
+    def __init__(self, status: int, headers, body: bytes):
+        super().__init__(f"Jira HTTP Error: {status}")
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+async def read_limited(response, limit: int) -> bytes:
+    """Read up to limit bytes of a response body, waiting for more data until EOF"""
+    chunks = []
+    remaining = limit
+    while remaining > 0:
+        chunk = await response.content.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+def retry_delay(response, attempt: int) -> float:
+    """Get seconds to wait before retrying a rate-limited (429) response, at most MAX_RETRY_DELAY"""
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_DELAY)
+    return min(float(2 ** attempt), MAX_RETRY_DELAY)
+
+@asynccontextmanager
+async def jira_get(endpoint: str, params: Optional[dict] = None):
+    """Open a GET request to Jira API, raising JiraHTTPError on error responses.
+
+    Requests are throttled to JIRA_RPS and retried with backoff when Jira answers 429.
+    """
     url = f"{JIRA_URL}/rest/api/2/{endpoint}"
-    response = requests.get(url, headers=get_headers(), params=params)
-    response.raise_for_status()
-    return response.json()
+    for attempt in range(JIRA_MAX_RETRIES + 1):
+        async with _throttler:
+            response = await _session.get(url, params=params)
+        if response.status != 429 or attempt == JIRA_MAX_RETRIES:
+            break
+        delay = retry_delay(response, attempt)
+        response.release()
+        await asyncio.sleep(delay)
+    
+    async with response:
+        if response.status >= 400:
+            # Only reasonably sized JSON errors are read for parsing; anything
+            # else (e.g. HTML pages) is read up to the detail limit
+            is_json = "json" in response.headers.get("Content-Type", "")
+            if is_json and (response.content_length or 0) <= ERROR_JSON_LIMIT:
+                limit = ERROR_JSON_LIMIT
+            else:
+                limit = ERROR_DETAIL_LIMIT
+            raise JiraHTTPError(response.status, response.headers, await read_limited(response, limit))
+        yield response
+
+async def fetch_jira(endpoint: str, params: Optional[dict] = None):
+    """Make a GET request to Jira API"""
+    async with jira_get(endpoint, params) as response:
+        return orjson.loads(await response.read())
+
+async def stream_search(params: dict):
+    """Run a Jira search, cleaning each issue as it is parsed from the response stream"""
+    total = 0
+    issues = []
+    builder = None
+    
+    async with jira_get("search", params) as response:
+        async for prefix, event, value in ijson.parse_async(response.content, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == "issues.item" and event == "end_map":
+                    issues.append(clean_issue_data(builder.value))
+                    builder = None
+            elif prefix == "issues.item" and event == "start_map":
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif prefix == "total" and event == "number":
+                total = value
+    
+    return {"total": total, "issues": issues}
+
+def cache_ttl(endpoint: str) -> float:
+    """Get the cache TTL for an endpoint (0 means not cached)"""
+    for prefix, ttl in CACHE_TTLS:
+        if endpoint.startswith(prefix):
+            return ttl
+    return 0.0
+
+def cache_key(endpoint: str, params: Optional[dict] = None):
+    """Build the cache key for a request"""
+    return (endpoint, tuple(sorted((params or {}).items())))
+
+def cache_store(key, data, ttl: float):
+    """Store data in the cache for ttl seconds, evicting the least recently used entry once full"""
+    _cache.pop(key, None)
+    if len(_cache) >= CACHE_MAX_ENTRIES:
+        del _cache[next(iter(_cache))]
+    _cache[key] = (time.monotonic() + ttl, data)
+
+async def cached(key, ttl: float, fetch):
+    """Return the cached value for key, calling fetch() when missing or expired.
+
+    Concurrent misses for the same key share a single fetch. If Jira fails
+    with a 5xx error, an expired entry is served instead.
+    """
+    entry = _cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        # Move the hit to the end so eviction always drops the least recently used entry
+        _cache[key] = _cache.pop(key)
+        return entry[1]
+    
+    task = _inflight.get(key)
+    if task is None:
+        async def refresh():
+            data = await fetch()
+            cache_store(key, data, ttl)
+            return data
+        
+        task = asyncio.ensure_future(refresh())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    
+    try:
+        # Shield so a cancelled caller doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+    except JiraHTTPError as e:
+        if entry and e.status >= 500:
+            return entry[1]
+        raise
+
+async def make_jira_request(endpoint: str, params: Optional[dict] = None):
+    """Make a GET request to Jira API, served from cache while fresh"""
+    ttl = cache_ttl(endpoint)
+    if not ttl:
+        return await fetch_jira(endpoint, params)
+    return await cached(cache_key(endpoint, params), ttl, lambda: fetch_jira(endpoint, params))
+
+async def search_jira_issues(params: dict):
+    """Search Jira issues, served from cache while fresh"""
+    return await cached(cache_key("search", params), cache_ttl("search"), lambda: stream_search(params))
+
+def to_json(obj) -> str:
+    """Serialize a tool result to JSON text"""
+    return orjson.dumps(obj, option=_JSON_OPTION).decode()
+
+def jira_error_data(e: JiraHTTPError) -> dict:
+    """Build the error payload for a Jira error response"""
+    error_data = {"error": f"Jira HTTP Error: {e.status}"}
+    detail = None
+    if "json" in e.headers.get("Content-Type", ""):
+        try:
+            error_detail = orjson.loads(e.body)
+            detail = error_detail.get('errorMessages', error_detail) if isinstance(error_detail, dict) else error_detail
+        except orjson.JSONDecodeError:
+            pass
+    if detail is None:
+        detail = e.body[:ERROR_DETAIL_LIMIT].decode(errors="replace")
+    error_data["detail"] = detail
+    return error_data
+
+async def get_issues_bulk(keys: list[str], workers: int = JIRA_MAX_WORKERS):
+    """Fetch several Jira issues concurrently, at most `workers` at a time.
+
+    A failed fetch returns its exception in place of the issue, so one bad key
+    doesn't discard the other results.
+    """
+    semaphore = asyncio.Semaphore(workers)
+
+    async def fetch(key):
+        async with semaphore:
+            return await make_jira_request(f"issue/{key}")
+
+    return await asyncio.gather(*(fetch(key) for key in keys), return_exceptions=True)
 
 def extract_text_from_adf(adf_content):
     """Extract plain text from ADF (Atlassian Document Format)"""
@@ -41,36 +266,46 @@ def extract_text_from_adf(adf_content):
     
     text_parts = []
     
-    def extract_recursive(node):
-        if isinstance(node, dict):
-            if "text" in node:
-                text_parts.append(node["text"])
-            if "content" in node:
-                for child in node["content"]:
-                    extract_recursive(child)
-        elif isinstance(node, list):
-            for item in node:
-                extract_recursive(item)
+    # Depth-first walk with an explicit stack; children are pushed reversed to keep document order
+    stack = deque([adf_content])
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is dict:
+            text = node.get("text")
+            if text:
+                text_parts.append(text)
+            content = node.get("content")
+            if content:
+                stack.extend(reversed(content))
+        elif node_type is list:
+            stack.extend(reversed(node))
     
-    extract_recursive(adf_content)
     return " ".join(text_parts)
 
 def clean_issue_data(issue):
     """Extract and clean relevant data from a Jira issue"""
-    fields = issue.get("fields", {})
+    fields = issue.get("fields") or {}
+    get = fields.get
+    key = issue.get("key")
+    status = get("status") or {}
+    issue_type = get("issuetype") or {}
+    assignee = get("assignee")
+    priority = get("priority")
+    reporter = get("reporter")
     
     return {
-        "key": issue.get("key"),
-        "summary": fields.get("summary"),
-        "status": fields.get("status", {}).get("name"),
-        "type": fields.get("issuetype", {}).get("name"),
-        "assignee": fields.get("assignee", {}).get("displayName") if fields.get("assignee") else "Unassigned",
-        "priority": fields.get("priority", {}).get("name") if fields.get("priority") else None,
-        "reporter": fields.get("reporter", {}).get("displayName") if fields.get("reporter") else None,
-        "created": fields.get("created"),
-        "updated": fields.get("updated"),
-        "description": extract_text_from_adf(fields.get("description")),
-        "url": f"{JIRA_URL}/browse/{issue.get('key')}"
+        "key": key,
+        "summary": get("summary"),
+        "status": status.get("name"),
+        "type": issue_type.get("name"),
+        "assignee": assignee.get("displayName") if assignee else "Unassigned",
+        "priority": priority.get("name") if priority else None,
+        "reporter": reporter.get("displayName") if reporter else None,
+        "created": get("created"),
+        "updated": get("updated"),
+        "description": extract_text_from_adf(get("description")),
+        "url": f"{JIRA_URL}/browse/{key}"
     }
 
 @server.list_tools()
@@ -91,6 +326,22 @@ async def handle_list_tools() -> list[types.Tool]:
                 "required": ["issue_key"],
             },
         ),
+        types.Tool(
+            name="get_issues",
+            description="Get complete details of several Jira tickets at once",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "issue_keys": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "maxItems": MAX_BULK_ISSUES,
+                        "description": f"Issue keys, up to {MAX_BULK_ISSUES} (e.g.: [\"PROJ-123\", \"DEV-45\"])",
+                    }
+                },
+                "required": ["issue_keys"],
+            },
+        ),
         types.Tool(
             name="search_issues",
             description="Search for Jira tickets by different criteria like status, project, assignee, etc.",
@@ -160,164 +411,187 @@ async def handle_call_tool(
     name: str, arguments: dict | None
 ) -> list[types.TextContent]:
     """Handle calls to Jira tools"""
+    TextContent = types.TextContent
+    argv = arguments or {}
     
     # Verify configuration
     if not JIRA_URL or not JIRA_PAT:
-        return [types.TextContent(
+        return [TextContent(
             type="text",
-            text=json.dumps({
+            text=to_json({
                 "error": "Missing JIRA_URL or JIRA_PAT in environment variables"
             })
         )]
     try:
         # TOOL 1: Get a specific ticket
         if name == "get_issue":
-            issue_key = arguments.get("issue_key")
+            issue_key = argv.get("issue_key")
             
             if not issue_key:
-                return [types.TextContent(
+                return [TextContent(
                     type="text",
-                    text=json.dumps({"error": "issue_key is required"})
+                    text=to_json({"error": "issue_key is required"})
                 )]
             
             # Get issue from Jira
-            issue = make_jira_request(f"issue/{issue_key}")
+            issue = await make_jira_request(f"issue/{issue_key}")
             
             # Return cleaned data as JSON
-            return [types.TextContent(
+            return [TextContent(
                 type="text",
-                text=json.dumps(clean_issue_data(issue), indent=2)
+                text=to_json(clean_issue_data(issue))
             )]
         
-        # TOOL 2: Search tickets by criteria
-        elif name == "search_issues":
-            # Build JQL query based on criteria
-            jql_parts = []
+        # TOOL 2: Get several tickets
+        elif name == "get_issues":
+            issue_keys = argv.get("issue_keys")
             
-            project = arguments.get("project")
-            status = arguments.get("status")
-            assignee = arguments.get("assignee")
-            issue_type = arguments.get("issue_type")
-            text = arguments.get("text")
-            max_results = arguments.get("max_results", 20)
+            # Accept a single key, but never iterate a string character by character
+            if isinstance(issue_keys, str):
+                issue_keys = [issue_keys]
             
-            if project:
-                jql_parts.append(f'project = "{project}"')
-            if status:
-                jql_parts.append(f'status = "{status}"')
-            if assignee:
-                if assignee.lower() == "currentuser()":
-                    jql_parts.append('assignee = currentUser()')
+            if not issue_keys:
+                return [TextContent(
+                    type="text",
+                    text=to_json({"error": "issue_keys is required"})
+                )]
+            
+            if not isinstance(issue_keys, list) or not all(isinstance(key, str) and key for key in issue_keys):
+                return [TextContent(
+                    type="text",
+                    text=to_json({"error": "issue_keys must be a list of issue keys"})
+                )]
+            
+            # Drop duplicates, keeping the requested order
+            issue_keys = list(dict.fromkeys(issue_keys))
+            if len(issue_keys) > MAX_BULK_ISSUES:
+                return [TextContent(
+                    type="text",
+                    text=to_json({"error": f"At most {MAX_BULK_ISSUES} issue_keys can be fetched at once"})
+                )]
+            
+            # Get all issues from Jira concurrently, reporting failures per key
+            results = await get_issues_bulk(issue_keys)
+            issues = []
+            for issue_key, result in zip(issue_keys, results):
+                if isinstance(result, JiraHTTPError):
+                    issues.append({"key": issue_key, **jira_error_data(result)})
+                elif isinstance(result, Exception):
+                    issues.append({"key": issue_key, "error": f"Unexpected error: {str(result)}"})
                 else:
-                    jql_parts.append(f'assignee = "{assignee}"')
-            if issue_type:
-                jql_parts.append(f'issuetype = "{issue_type}"')
-            if text:
-                jql_parts.append(f'(summary ~ "{text}" OR description ~ "{text}")')
+                    issues.append(clean_issue_data(result))
+            
+            return [TextContent(
+                type="text",
+                text=to_json(issues)
+            )]
+        
+        # TOOL 3: Search tickets by criteria
+        elif name == "search_issues":
+            max_results = argv.get("max_results", 20)
+            
+            # Build JQL query based on criteria
+            jql_parts = [predicate(value) for arg, predicate in _JQL_PREDICATES if (value := argv.get(arg))]
             
             jql = " AND ".join(jql_parts) if jql_parts else "order by created DESC"
             
             # Perform search
-            search_result = make_jira_request(
-                "search",
-                params={
+            search_result = await search_jira_issues(
+                {
                     "jql": jql,
                     "maxResults": min(max_results, 100),
-                    "fields": "summary,status,assignee,issuetype,priority,created,updated"
+                    "fields": _SEARCH_FIELDS
                 }
             )
             
-            issues = search_result.get("issues", [])
-            total = search_result.get("total", 0)
+            issues = search_result["issues"]
             
             # Return data structure
             result = {
-                "total": total,
+                "total": search_result["total"],
                 "count": len(issues),
                 "jql": jql,
-                "issues": [clean_issue_data(issue) for issue in issues]
+                "issues": issues
             }
             
-            return [types.TextContent(
+            return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=to_json(result)
             )]
 
-        # TOOL 3: Get my tickets
+        # TOOL 4: Get my tickets
         elif name == "get_my_issues":
-            status = arguments.get("status")
-            max_results = arguments.get("max_results", 20)
+            status = argv.get("status")
+            max_results = argv.get("max_results", 20)
             
             # Build JQL for current user tickets
             jql = "assignee = currentUser()"
             if status:
-                jql += f' AND status = "{status}"'
+                jql += f' AND status = "{escape_jql(status)}"'
             jql += " ORDER BY updated DESC"
             
             # Perform search
-            search_result = make_jira_request(
-                "search",
-                params={
+            search_result = await search_jira_issues(
+                {
                     "jql": jql,
                     "maxResults": max_results,
-                    "fields": "summary,status,issuetype,priority,updated"
+                    "fields": _MY_FIELDS
                 }
             )
             
-            issues = search_result.get("issues", [])
-            total = search_result.get("total", 0)
+            issues = search_result["issues"]
             
             # Return data structure
             result = {
-                "total": total,
+                "total": search_result["total"],
                 "count": len(issues),
                 "status_filter": status,
-                "issues": [clean_issue_data(issue) for issue in issues]
+                "issues": issues
             }
             
-            return [types.TextContent(
+            return [TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=to_json(result)
             )]
         
         # Unknown tool
         else:
-            return [types.TextContent(
+            return [TextContent(
                 type="text",
-                text=json.dumps({"error": f"Unknown tool: {name}"})
+                text=to_json({"error": f"Unknown tool: {name}"})
             )]
     
-    except requests.exceptions.HTTPError as e:
-        error_data = {"error": f"Jira HTTP Error: {e.response.status_code}"}
-        try:
-            error_detail = e.response.json()
-            error_data["detail"] = error_detail.get('errorMessages', error_detail)
-        except:
-            error_data["detail"] = e.response.text
-        
-        return [types.TextContent(type="text", text=json.dumps(error_data))]
+    except JiraHTTPError as e:
+        return [TextContent(type="text", text=to_json(jira_error_data(e)))]
     
     except Exception as e:
-        return [types.TextContent(
+        return [TextContent(
             type="text",
-            text=json.dumps({"error": f"Unexpected error: {str(e)}"})
+            text=to_json({"error": f"Unexpected error: {str(e)}"})
         )]
     
 async def main():
     """Main entry point"""
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="jira-mcp",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    global _session
+    connector = aiohttp.TCPConnector(
+        limit=POOL_MAX_CONNECTIONS,
+        keepalive_timeout=POOL_KEEPALIVE_TIMEOUT,
+    )
+    async with aiohttp.ClientSession(headers=_HEADERS, connector=connector) as session:
+        _session = session
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="jira-mcp",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file